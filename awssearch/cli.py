@@ -1,19 +1,33 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 
 """ A tool for searchiing for AWS resources across multiple accounts and 
 regions.
 """
 
-from __future__ import print_function
 import argparse
+from collections import OrderedDict
+import copy
+import json
 import os
 import sys
+import tempfile
 
-from botocore import exceptions
-import yaml
+from .version import __version__
 
-from search import SearchEc2Instances, SearchElbInstances
-from version import __version__
+# Parsed config files keyed by path. Each entry holds the (mtime, size) of the
+# file when it was parsed so a changed file is re-read.
+_CONFIG_CACHE = OrderedDict()
+_CONFIG_CACHE_SIZE = 100
+
+def _non_negative_int(value):
+    """Return value as an int, for argparse, if it is 0 or more."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value} is not a whole number")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{value} is less than 0")
+    return number
 
 def parse_commandline_args():
     """Parse commandline arguments.
@@ -24,9 +38,14 @@ def parse_commandline_args():
     parser.add_argument('-a', '--account',
                         dest='aws_account',
                         default='all')
+    parser.add_argument('--cache-ttl',
+                        dest='cache_ttl',
+                        type=_non_negative_int,
+                        default=60)
     parser.add_argument('-f', '--format',
                         dest='print_format',
-                        default='table')
+                        default='table',
+                        choices=('table', 'json'))
     parser.add_argument('-r', '--region',
                         dest='aws_regions',
                         default='all')
@@ -36,6 +55,7 @@ def parse_commandline_args():
                         action='version', version='%(prog)s ' + __version__)
 
     subparsers = parser.add_subparsers(help='AWS resource to search for', dest='resource')
+    subparsers.required = True
 
     # ec2 sub-command
     parser_ec2 = subparsers.add_parser('ec2', help='search for ec2 instances')
@@ -57,31 +77,100 @@ def parse_commandline_args():
                             dest='instance_tags')
 
     # elb sub-command
-    parser_ec2 = subparsers.add_parser('elb', help='search for elb instances')
-    parser_ec2.add_argument('--dns',
+    parser_elb = subparsers.add_parser('elb', help='search for elb instances')
+    parser_elb.add_argument('--dns',
                             dest='instance_dns_name')
-    parser_ec2.add_argument('-n', '--name',
+    parser_elb.add_argument('-n', '--name',
                             dest='instance_name',)
 
     return parser.parse_args()
 
+def _load_config_file(config_path, config_stat):
+    """Return the parsed contents of the YAML file at config_path.
+
+    A JSON copy of the parsed file is kept alongside it (config_path + '.json')
+    along with the modification time and size the YAML file had when it was
+    parsed. The copy is used instead of the YAML file as long as both still
+    match exactly, so a file restored with an older modification time or
+    edited straight after the copy was written is still re-read.
+    """
+    json_path = config_path + '.json'
+    source = [config_stat.st_mtime_ns, config_stat.st_size]
+    try:
+        with open(json_path) as json_fh:
+            cached = json.load(json_fh)
+        if cached['source'] == source:
+            return cached['config']
+    except (OSError, IOError, ValueError, KeyError, TypeError):
+        pass
+
+    # yaml is only imported when needed to keep startup fast
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
+    try:
+        with open(config_path) as config_fh:
+            conf = yaml.load(config_fh, Loader=SafeLoader)
+    except IOError:
+        raise IOError("please configure ~/.awssearch.yml")
+
+    # Write the JSON copy to a temporary file first so a concurrent run never
+    # reads a partially written file.
+    try:
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(json_path))
+        try:
+            with os.fdopen(tmp_fd, 'w') as json_fh:
+                json.dump({'source': source, 'config': conf}, json_fh)
+            os.replace(tmp_path, json_path)
+        except (IOError, OSError, TypeError, ValueError):
+            os.remove(tmp_path)
+    except (IOError, OSError):
+        pass
+
+    return conf
+
 def parse_config():
     """Return a dict representing the configuration
 
+    The parsed configuration is cached and only re-read when the file's
+    modification time or size changes.
     """
+    config_path = os.path.expanduser('~/.awssearch.yml')
     try:
-        with open(os.path.expanduser('~/.awssearch.yml')) as config_fh:
-            return yaml.load(config_fh)
-    except IOError:
+        config_stat = os.stat(config_path)
+    except OSError:
         raise IOError("please configure ~/.awssearch.yml")
+    config_key = (config_stat.st_mtime_ns, config_stat.st_size)
+
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == config_key:
+        conf = cached[1]
+    else:
+        conf = _load_config_file(config_path, config_stat)
+        _CONFIG_CACHE[config_path] = (config_key, conf)
+    # Keep the most recently used entry last
+    _CONFIG_CACHE.move_to_end(config_path)
+    while len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+        _CONFIG_CACHE.popitem(last=False)
+
+    return copy.deepcopy(conf)
 
 def main():
     """Main point of entry.
     """
 
-    conf = parse_config()
+    # Parse the arguments before the slow imports below so --help and
+    # --version return immediately
     args = parse_commandline_args()
 
+    from botocore import exceptions
+    from .search import SearchEc2Instances, SearchElbInstances, close_clients
+
+    conf = parse_config()
+
     if args.aws_account == 'all':
         aws_accounts = conf['aws_accounts']
     else:
@@ -92,45 +181,40 @@ def main():
     else:
         aws_regions = [args.aws_regions]
 
-    search_filter = {}
-
-    if args.resource == 'ec2':
-        aws_resource_type = SearchEc2Instances
-        if args.instance_name:
-            search_filter.update({'instance_name': args.instance_name})
-        if args.instance_id:
-            search_filter.update({'instance_id': args.instance_id})
-        if args.instance_tags:
-            search_filter.update({'instance_tags': args.instance_tags})
-        if args.instance_ip:
-            search_filter.update({'instance_ip': args.instance_ip})
-        if args.instance_sg:
-            search_filter.update({'instance_sg': args.instance_sg})
-        # State defaults to 'running' so always apply this filter
-        search_filter.update({'instance_state': args.instance_state})
-
-    elif args.resource == 'elb':
-        aws_resource_type = SearchElbInstances
-        if args.instance_name:
-            search_filter.update({'instance_name': args.instance_name})
-        if args.instance_dns_name:
-            search_filter.update({'instance_dns_name': args.instance_dns_name})
-    else:
-        print("unsupported AWS resource: {}".format(args.resource))
+    aws_resource_type = {
+            'ec2': SearchEc2Instances,
+            'elb': SearchElbInstances,
+            }[args.resource]
 
+    # Every sub-command option is stored as 'instance_*'. The ec2 state
+    # defaults to 'running' so that filter is always applied.
+    search_filter = {field: value for field, value in vars(args).items()
+                     if field.startswith('instance_') and value}
+
+    # The clients are cached for the life of the process, so close their
+    # connections once the search is done
     try:
-        instances = aws_resource_type(aws_accounts, aws_regions)
-    except (exceptions.ProfileNotFound, exceptions.NoCredentialsError):
-        print(("There was an issue matching the accounts in "
-               "~/.awssearch.yml with the account profiles in "
-               "~/.aws/credentials`. "
-               "\nSee the README for more details."))
-        sys.exit(1)
+        try:
+            instances = aws_resource_type(aws_accounts, aws_regions,
+                                          search_filter,
+                                          cache_ttl=args.cache_ttl)
+        except (exceptions.ProfileNotFound, exceptions.NoCredentialsError):
+            print(("There was an issue matching the accounts in "
+                   "~/.awssearch.yml with the account profiles in "
+                   "~/.aws/credentials`. "
+                   "\nSee the README for more details."))
+            sys.exit(1)
+    finally:
+        close_clients()
     instances.filter(search_filter)
     instances.print_instances(
         print_format=args.print_format,
         verbose=args.verbose,
         )
+    # The instances that were found are still printed, but the results are
+    # incomplete if any account or region couldn't be searched
+    if instances.failed_locations:
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -1,61 +1,221 @@
 """Classes that represent individual AWS resources
 """
 
-from __future__ import print_function
 from datetime import date, datetime
 import abc
+from collections import namedtuple
+import functools
+from sys import intern
+
+# A field of an instance that can be printed, and whether it is only shown in
+# verbose output
+FieldSpec = namedtuple('FieldSpec', ('name', 'printable_name', 'verbose_display'))
+
+# How the values of a multi-valued field are joined for each print format
+_list_separators = {
+        'table': "\n",
+        'json': ",",
+        }
+
+# Joins the tags (or security groups) of an instance into one string that each
+# search term is matched against with a single substring search. Search terms
+# come from the command line and can't contain it, so a term can never match
+# across two tags.
+_SEARCH_SEPARATOR = "\x00"
+
+def _intern(value):
+    """Return the interned copy of value if it is a str, otherwise value.
+
+    Values repeated across many instances (accounts, states) are interned so
+    every instance shares one copy and comparisons can short-circuit on
+    identity.
+    """
+    if type(value) is str:
+        return intern(value)
+    return value
 
-class AWSInstance(object):
+class AWSInstance(abc.ABC):
     """Represent a single AWS resource instance.
 
     """
 
+    __slots__ = ('instance', 'aws_account', '_lower', '_search_values')
+
     def __init__(self, instance, aws_account):
         self.instance = instance
-        self.aws_account = aws_account
+        self.aws_account = _intern(aws_account)
+        # Lower-cased field values, filled in by _get_lower as they are needed
+        self._lower = {}
+        self._search_values = None
+
+    @property
+    def _search(self):
+        """The lower-cased field values that _search_columns refer to.
+
+        They are only built the first time the instance is searched, so a
+        listing with nothing left to filter locally never pays for them.
+        """
+        if self._search_values is None:
+            self._search_values = self._get_search_values()
+        return self._search_values
+
+    def _get_search_values(self):
+        """Return the values for _search. Set by each subclass."""
+        return {}
 
     def __repr__(self):
-        output = []
-        for attr in dir(self.instance):
-            if not attr.startswith('__'):
-                output.append("{}: {}".format(attr, getattr(self.instance, attr)))
-        return "\n".join(output)
+        # The verbose attribute list covers every field and is cached per class
+        return "\n".join(f"{name}: {self[name]}"
+                         for name in self.get_attributes(True))
+
+    # Items that aren't keys of the API response, mapped to a function that
+    # returns their value. Set by each subclass.
+    _computed_fields = {}
 
     def __getitem__(self, item):
+        compute = self._computed_fields.get(item)
+        if compute is not None:
+            return compute(self)
+        return self.instance.get(item)
+
+    def _get_lower(self, item):
+        """Return the lower-cased value of item or None if it isn't a string.
+
+        The result is cached so each field is only lower-cased once no matter
+        how many search parameters it is matched against.
+        """
         try:
-            return self.instance[item]
+            return self._lower[item]
         except KeyError:
-            return []
+            pass
+        try:
+            lower = self[item].lower()
+        except AttributeError:
+            lower = None
+        self._lower[item] = lower
+        return lower
+
+    # Search fields that are a plain substring match against one of the
+    # precomputed, lower-cased values in each instance's _search dict. Set by
+    # each subclass.
+    _search_columns = {}
+
+    # Search fields where every one of a list of values must match one of
+    # the precomputed values in _search. Set by each subclass.
+    _search_list_columns = {}
+
+    # Other search fields that have their own match method, mapped to the
+    # method's name. Set by each subclass.
+    _match_methods = {}
 
-    @abc.abstractmethod
     def match(self, attribute, value):
-        pass
+        """Returns true if value matches the attribute of self
+
+        value must already be lower-cased, or be a list of lower-cased
+        strings, so it is only lower-cased once for a whole set of instances.
+        Fields in _search_columns and _search_list_columns are matched by
+        match_all, so there is only one set of rules for them.
+        """
+        if attribute in self._search_columns or \
+                attribute in self._search_list_columns:
+            return bool(self.match_all((self,), attribute, value))
+        return self._match_field(attribute, value)
+
+    def _match_field(self, attribute, value):
+        """Returns true if value matches an attribute of self that isn't in
+        _search_columns or _search_list_columns.
+
+        Fields with no entry in _match_methods are a substring match against
+        the lower-cased field value.
+        """
+        match_method = self._match_methods.get(attribute)
+        if match_method is not None:
+            return getattr(self, match_method)(value)
+        field_value = self._get_lower(attribute)
+        if not field_value:
+            return False
+        return value in field_value
 
     @classmethod
+    def match_all(cls, instances, attribute, value):
+        """Return the instances whose attribute matches value.
+
+        Fields listed in _search_columns and _search_list_columns are matched
+        by scanning their precomputed value in _search on every instance.
+        Other fields are matched by calling _match_field on each instance.
+
+        Args:
+          - instances: The instances to match. (list)
+          - attribute: A string representing an attribute of the instances
+          - value: A lower-cased string, or list of lower-cased strings
+        """
+        column = cls._search_columns.get(attribute)
+        if column is not None:
+            return [inst for inst in instances
+                    if inst._search[column] and value in inst._search[column]]
+        column = cls._search_list_columns.get(attribute)
+        if column is not None:
+            # Narrow the candidates one value at a time so each scan only
+            # covers the instances that matched every value before it
+            # Empty values are skipped, as they would otherwise match
+            # instances with no values at all through the empty joined string
+            candidates = list(instances)
+            for item in value:
+                if not candidates:
+                    break
+                if not item:
+                    continue
+                candidates = [inst for inst in candidates
+                              if item in inst._search[column]]
+            return candidates
+        return [inst for inst in instances
+                if inst._match_field(attribute, value)]
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
     def _get_printable_fields(cls, verbose):
-        """Return a list of the printable fields.
+        """Return a tuple of the (name, printable name) pairs of the printable
+        fields.
+
+        The fields only depend on the class and verbose so they are worked out
+        once and cached.
 
         Args:
           - verbose: Include all fields or not. (boolean)
         """
-        fields = []
-        for field in cls.instance_fields:
-            field_name = field['name']
-            field_printable_name = field['printable_name']
-            field_verbose = field['verbose_display']
-            if verbose and field_verbose:
-                fields.append((field_name, field_printable_name))
-            elif not field_verbose:
-                fields.append((field_name, field_printable_name))
-        return fields
+        return tuple((field.name, field.printable_name)
+                     for field in cls.instance_fields
+                     if verbose or not field.verbose_display)
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def get_printable_attribute_names(cls, verbose):
-        return [name_tuple[1] for name_tuple in cls._get_printable_fields(verbose)]
+        """Return a cached tuple of the printable names of the fields."""
+        return tuple(printable_name for _, printable_name
+                     in cls._get_printable_fields(verbose))
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def get_attributes(cls, verbose):
-        return [name_tuple[0] for name_tuple in cls._get_printable_fields(verbose)]
+        """Return a cached tuple of the names of the printable fields."""
+        return tuple(name for name, _ in cls._get_printable_fields(verbose))
+
+    # Fields whose raw value needs formatting before it's printed, mapped to
+    # their format function. Set by each subclass.
+    _field_format_functions = {}
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def get_field_formatters(cls, verbose):
+        """Return a cached tuple of (field name, format function) pairs.
+
+        The format function is None for fields that are printed as they are.
+
+        Args:
+          - verbose: Include all fields or not. (boolean)
+        """
+        return tuple((name, cls._field_format_functions.get(name))
+                     for name in cls.get_attributes(verbose))
 
     @staticmethod
     def json_serial(obj):
@@ -78,111 +238,60 @@ class Ec2Instance(AWSInstance):
 
     """
 
-    instance_fields = [
-            {
-                'name': 'instance_name',
-                'printable_name': 'Name',
-                'verbose_display': False,
-            },
-            {
-                'name': 'InstanceId',
-                'printable_name': "Instance ID",
-                'verbose_display': False,
-            },
-            {
-                'name': 'InstanceType',
-                'printable_name': "Type",
-                'verbose_display': True,
-            },
-            {
-                'name': 'State',
-                'printable_name': "State",
-                'verbose_display': True,
-            },
-            {
-                'name': 'instance_placement',
-                'printable_name': "Placement",
-                'verbose_display': False,
-            },
-            {
-                'name': 'PrivateIpAddress',
-                'printable_name': "Private IP",
-                'verbose_display': False,
-            },
-            {
-                'name': 'PublicIpAddress',
-                'printable_name': "Public IP",
-                'verbose_display': False,
-            },
-            {
-                'name': 'Tags',
-                'printable_name': "Tags",
-                'verbose_display': False,
-            },
-            {
-                'name': 'SecurityGroups',
-                'printable_name': "Security Groups",
-                'verbose_display': True,
-            },
-            {
-                'name': 'LaunchTime',
-                'printable_name': "Launch Time",
-                'verbose_display': True,
-            },
-            {
-                'name': 'aws_account',
-                'printable_name': "Account",
-                'verbose_display': False,
-            },
-    ]
+    instance_fields = (
+            FieldSpec('instance_name', 'Name', False),
+            FieldSpec('InstanceId', "Instance ID", False),
+            FieldSpec('InstanceType', "Type", True),
+            FieldSpec('State', "State", True),
+            FieldSpec('instance_placement', "Placement", False),
+            FieldSpec('PrivateIpAddress', "Private IP", False),
+            FieldSpec('PublicIpAddress', "Public IP", False),
+            FieldSpec('Tags', "Tags", False),
+            FieldSpec('SecurityGroups', "Security Groups", True),
+            FieldSpec('LaunchTime', "Launch Time", True),
+            FieldSpec('aws_account', "Account", False),
+            )
+
+    __slots__ = ('_tags_by_key', '_name')
+
+    def __init__(self, instance, aws_account):
+        super().__init__(instance, aws_account)
+        self._tags_by_key = {tag['Key']: tag['Value']
+                             for tag in self['Tags'] or ()}
+        self._name = self._tags_by_key.get('Name')
+
+    def _get_search_values(self):
+        # Lower-cased copies of the fields used by match(), built once rather
+        # than for every search parameter when filtering.
+        state = self['State']
+        return {
+            'name': self._name.lower() if self._name else '',
+            'id': (self['InstanceId'] or '').lower(),
+            'private_ip': self['PrivateIpAddress'] or '',
+            'public_ip': self['PublicIpAddress'] or '',
+            'state': _intern(state['Name']) if state else '',
+            'tags': _SEARCH_SEPARATOR.join(
+                f"{key.lower()}={value.lower()}"
+                for key, value in self._tags_by_key.items() if key != 'Name'),
+            'sgs': _SEARCH_SEPARATOR.join(
+                self._sg_format(sg['GroupName'].lower(), sg['GroupId'].lower())
+                for sg in self['SecurityGroups'] or ()),
+        }
 
     # Static helper methods
     @staticmethod
     def _sg_format(sg_name, sg_id):
-        return "{} - {}".format(sg_name, sg_id)
+        return f"{sg_name} - {sg_id}"
 
-    def __getitem__(self, item):
-        if item == 'aws_account':
-            return self.aws_account
-        elif item == 'Name' or item == 'instance_name':
-            return self._get_name()
-        elif item == 'instance_placement':
-            return super(Ec2Instance, self).__getitem__('Placement')['AvailabilityZone']
-        else:
-            return super(Ec2Instance, self).__getitem__(item)
+    _computed_fields = {
+            'aws_account': lambda self: self.aws_account,
+            'Name': lambda self: self._get_name(),
+            'instance_name': lambda self: self._get_name(),
+            'instance_placement': lambda self: (self['Placement'] or {}).get('AvailabilityZone'),
+            }
 
     def _get_name(self):
-        for tag in self['Tags']:
-            if tag['Key'] == 'Name':
-                return tag['Value']
-
-    def _match_tags(self, match_tags):
-        """Returns true if each of the tags in match_tags matches a tag in self
-
-        Args:
-          - match_tags: A list of strings to match against
-
-        Returns:
-          - True if each tag in match_tags matches a tag in self.
-        """
-        instance_tags = ["{}={}".format(tag['Key'].lower(), tag['Value'].lower()) for tag in self['Tags'] if tag['Key'] != 'Name']
-        matches = {mtag:itag for mtag in match_tags for itag in instance_tags if mtag.lower() in itag}
-        if len(matches) == len(match_tags):
-            return True
-
-    def _match_securitygroups(self, match_sgs):
-        """Returns true if each of the strings in match_sgs matches a security group in self
-
-        Args:
-          - match_sgs: A list of strings representing partial security group names or IDs to match against
-
-        Returns:
-          - True if each string in match_sgs matches a security group in self.
-        """
-        sg_tags = [self._sg_format(sg['GroupName'].lower(), sg['GroupId'].lower()) for sg in self['SecurityGroups']]
-        matches = {msg:isg for msg in match_sgs for isg in sg_tags if msg.lower() in isg}
-        if len(matches) == len(match_sgs):
-            return True
+        return self._name
 
     def _match_ip(self, match_ip):
         """Returns true if match_ip matches either the private or public IP of self
@@ -193,8 +302,8 @@ class Ec2Instance(AWSInstance):
         Returns:
           - True if match_ip partially matches either the public or private IP of self
         """
-        public_ip = self['PublicIpAddress']
-        private_ip = self['PrivateIpAddress']
+        public_ip = self._search['public_ip']
+        private_ip = self._search['private_ip']
         if (private_ip and match_ip in private_ip) or \
             (public_ip  and match_ip in public_ip):
             return True
@@ -208,75 +317,24 @@ class Ec2Instance(AWSInstance):
         Returns:
           - True if match_state matches the running state of self
         """
-        running_state = self['State']['Name']
+        running_state = self._search['state']
         if match_state == running_state:
             return True
 
-    def _match_name(self, match_name):
-        """Returns true if match_name matches the name of self
-
-        Args:
-          - match_name: A string representing the name of an EC2 instance
-
-        Returns:
-          - True if match_name partially (or completely)  matches the name of self
-        """
-        name = self['Name']
-        if name and match_name.lower() in name.lower():
-            return True
-
-    def _match_id(self, match_instance_id):
-        """Returns true if match_instance_id matches the instance ID of self
-
-        Args:
-          - match_instance_id: A string representing a full or partial instance ID of an EC2 instance
-
-        Returns:
-          - True if match_instance_id partially (or completely)  matches the instance ID of self
-        """
-        name = self['InstanceId']
-        if name and match_instance_id.lower() in name.lower():
-            return True
-
-    def _match_generic(self, value, attribute):
-        """Returns true if value matches the attribute of self
-
-        Args:
-          - value: A string to match against the attribute of an EC2 instance
-          - attribute: A string representing an attribute of an EC2 instance
-
-        Returns:
-          - True if value partially (or completely) matches the attribute of self
-        """
-        field_value = self[attribute]
-        try:
-            if value.lower() in field_value.lower():
-                return True
-        except AttributeError:
-            return False
-
-    def match(self, attribute, value):
-        """Returns true if value matches the attribute of self
+    _search_columns = {
+            'instance_name': 'name',
+            'instance_id': 'id',
+            }
 
-        Args:
-          - value: A string to match against the attribute of an EC2 instance
-          - attribute: A string representing an attribute of an EC2 instance
+    _search_list_columns = {
+            'instance_tags': 'tags',
+            'instance_sg': 'sgs',
+            }
 
-        Returns:
-          - True if value partially (or completely) matches the attribute of self
-        """
-        match_methods = {
-                'instance_tags': self._match_tags,
-                'instance_ip': self._match_ip,
-                'instance_state': self._match_state,
-                'instance_name': self._match_name,
-                'instance_id': self._match_id,
-                'instance_sg': self._match_securitygroups,
-                }
-        try:
-            return match_methods[attribute](value)
-        except KeyError:
-            return self._match_generic(value, attribute)
+    _match_methods = {
+            'instance_ip': '_match_ip',
+            'instance_state': '_match_state',
+            }
 
     @staticmethod
     def _get_tag_printable_value(tag_data, print_format):
@@ -285,13 +343,9 @@ class Ec2Instance(AWSInstance):
         Args:
           - tag_data: The tag to be printed. (string)
         """
-        print_formats = {
-                'table': "\n".join(["{}={}".format(tags['Key'], tags['Value'])
-                                   for tags in tag_data if tags['Key'] != 'None']),
-                'json': ",".join(["{}={}".format(tags['Key'], tags['Value'])
-                                   for tags in tag_data if tags['Key'] != 'None']),
-                }
-        return print_formats[print_format]
+        return _list_separators[print_format].join(sorted(
+            f"{tags['Key']}={tags['Value']}"
+            for tags in tag_data or () if tags['Key'] != 'Name'))
 
     @staticmethod
     def _get_ip_printable_value(ip_data, print_format):
@@ -300,11 +354,11 @@ class Ec2Instance(AWSInstance):
         Args:
           - ip_data: The IP to be printed. (string)
         """
-        print_formats = {
-                'table': "ssh://{}".format(ip_data) if ip_data else "n/a",
-                'json': "{}".format(ip_data) if ip_data else "n/a",
-                }
-        return print_formats[print_format]
+        if not ip_data:
+            return "n/a"
+        if print_format == 'table':
+            return f"ssh://{ip_data}"
+        return f"{ip_data}"
 
     @staticmethod
     def _get_state_printable_value(state_data, print_format):
@@ -313,6 +367,8 @@ class Ec2Instance(AWSInstance):
         Args:
           - state_data: The tag to be printed. (string)
         """
+        if not state_data:
+            return "n/a"
         return state_data['Name']
 
     @staticmethod
@@ -322,11 +378,9 @@ class Ec2Instance(AWSInstance):
         Args:
           - sg_data: The security groups to be printed. (string)
         """
-        print_formats = {
-                'table': "\n".join(Ec2Instance._sg_format(sg['GroupName'], sg['GroupId']) for sg in sg_data),
-                'json': ",".join(Ec2Instance._sg_format(sg['GroupName'], sg['GroupId']) for sg in sg_data),
-                }
-        return print_formats[print_format]
+        return _list_separators[print_format].join(
+            Ec2Instance._sg_format(sg['GroupName'], sg['GroupId'])
+            for sg in sg_data or ())
 
     @staticmethod
     def _get_launchtime_printable_value(lt_data, print_format):
@@ -335,36 +389,19 @@ class Ec2Instance(AWSInstance):
         Args:
           - lt_data: The launch time to be printed. (string)
         """
-        print_formats = {
-                'table': lt_data,
-                'json': AWSInstance.json_serial(lt_data),
-                }
-        return print_formats[print_format]
-
-
-    @staticmethod
-    def get_field_printable_value(instance, field_name, print_format):
-        """Return a printable value for a given field.
-
-        Args:
-          - ec2_instance: The EC2 instance that is being printed. (Ec2Instance)
-          - field_name: The field that is to be printed. (string)
-        """
-        field_format_functions = {
-            'Tags': Ec2Instance._get_tag_printable_value,
-            'PrivateIpAddress': Ec2Instance._get_ip_printable_value,
-            'PublicIpAddress': Ec2Instance._get_ip_printable_value,
-            'State': Ec2Instance._get_state_printable_value,
-            'SecurityGroups': Ec2Instance._get_securitygroups_printable_value,
-            'LaunchTime': Ec2Instance._get_launchtime_printable_value,
-            }
-        field_data = instance[field_name]
-        try:
-            printable_data = field_format_functions[field_name](field_data, print_format)
-        except KeyError:
-            printable_data = field_data
+        if print_format == 'json' and lt_data is not None:
+            return AWSInstance.json_serial(lt_data)
+        return lt_data
 
-        return printable_data
+    # Fields whose raw value needs formatting before it's printed
+    _field_format_functions = {
+        'Tags': _get_tag_printable_value.__func__,
+        'PrivateIpAddress': _get_ip_printable_value.__func__,
+        'PublicIpAddress': _get_ip_printable_value.__func__,
+        'State': _get_state_printable_value.__func__,
+        'SecurityGroups': _get_securitygroups_printable_value.__func__,
+        'LaunchTime': _get_launchtime_printable_value.__func__,
+        }
 
 
 class ElbInstance(AWSInstance):
@@ -383,70 +420,45 @@ class ElbInstance(AWSInstance):
 
     """
 
-    instance_fields = [
-            {
-                'name': 'instance_name',
-                'printable_name': 'Name',
-                'verbose_display': False,
-            },
-            {
-                'name': 'DNSName',
-                'printable_name': "DNS Name",
-                'verbose_display': False,
-            },
-            {
-                'name': 'Instances',
-                'printable_name': "EC2 Instances",
-                'verbose_display': False,
-            },
-            {
-                'name': 'SecurityGroups',
-                'printable_name': "Security Groups",
-                'verbose_display': True,
-            },
-            {
-                'name': 'CreatedTime',
-                'printable_name': "Created Time",
-                'verbose_display': True,
-            },
-            {
-                'name': 'aws_account',
-                'printable_name': "Account",
-                'verbose_display': False,
-            },
-    ]
-
-    def __getitem__(self, item):
-        if item == 'aws_account':
-            return self.aws_account
-        elif item == 'Name' or item == 'instance_name':
-            return self._get_name()
-        elif item == 'instance_placement':
-            return super(ElbInstance, self).__getitem__('Placement')['AvailabilityZone']
-        else:
-            return super(ElbInstance, self).__getitem__(item)
+    instance_fields = (
+            FieldSpec('instance_name', 'Name', False),
+            FieldSpec('DNSName', "DNS Name", False),
+            FieldSpec('Instances', "EC2 Instances", False),
+            FieldSpec('SecurityGroups', "Security Groups", True),
+            FieldSpec('CreatedTime', "Created Time", True),
+            FieldSpec('aws_account', "Account", False),
+            )
+
+    __slots__ = ()
+
+    def _get_search_values(self):
+        # Lower-cased copies of the fields used by match(), built once rather
+        # than for every search parameter when filtering.
+        return {
+            'name': (self['LoadBalancerName'] or '').lower(),
+            'dns_name': (self['DNSName'] or '').lower(),
+        }
+
+    _computed_fields = {
+            'aws_account': lambda self: self.aws_account,
+            'Name': lambda self: self._get_name(),
+            'instance_name': lambda self: self._get_name(),
+            }
 
     def _get_name(self):
         return self['LoadBalancerName']
 
-    def match(self, attribute, value):
-        if attribute == 'instance_dns_name':
-            real_attribute = 'DNSName'
-        else:
-            real_attribute = attribute
-        field_value = self[real_attribute]
-        if value.lower() in field_value.lower():
-            return True
+    _search_columns = {
+            'instance_name': 'name',
+            'instance_dns_name': 'dns_name',
+            }
 
     @staticmethod
     def _get_instances_printable_value(instances, print_format):
         """Return the printable value thss set of ELBs.
         """
-        print_formats = {
-                'table': "\n".join([instance['InstanceId'] for instance in instances]),
-                'json': ",".join([instance['InstanceId'] for instance in instances]),
-                }
-        return print_formats[print_format]
+        return _list_separators[print_format].join(
+            instance['InstanceId'] for instance in instances or ())
 
     @staticmethod
     def _get_securitygroups_printable_value(sg_data, print_format):
@@ -455,11 +467,7 @@ class ElbInstance(AWSInstance):
         Args:
           - sg_data: The security groups to be printed. (string)
         """
-        print_formats = {
-                'table': "\n".join([sg for sg in sg_data]),
-                'json': ",".join([sg for sg in sg_data]),
-                }
-        return print_formats[print_format]
+        return _list_separators[print_format].join(sg_data or ())
 
     @staticmethod
     def _get_createdtime_printable_value(ct_data, print_format):
@@ -468,29 +476,13 @@ class ElbInstance(AWSInstance):
         Args:
           - ct_data: The launch time to be printed. (string)
         """
-        print_formats = {
-                'table': ct_data,
-                'json': AWSInstance.json_serial(ct_data),
-                }
-        return print_formats[print_format]
-
-    @staticmethod
-    def get_field_printable_value(instance, field_name, print_format):
-        """Return a printable value for a given field.
-
-        Args:
-          - instance: The AWS resource instance that is being printed. (AwsInstance)
-          - field_name: The field that is to be printed. (string)
-        """
-        field_format_functions = {
-            'Instances': ElbInstance._get_instances_printable_value,
-            'SecurityGroups': ElbInstance._get_securitygroups_printable_value,
-            'CreatedTime': ElbInstance._get_createdtime_printable_value,
-            }
-        field_data = instance[field_name]
-        try:
-            printable_data = field_format_functions[field_name](field_data, print_format)
-        except KeyError:
-            printable_data = field_data
-
-        return printable_data
+        if print_format == 'json' and ct_data is not None:
+            return AWSInstance.json_serial(ct_data)
+        return ct_data
+
+    # Fields whose raw value needs formatting before it's printed
+    _field_format_functions = {
+        'Instances': _get_instances_printable_value.__func__,
+        'SecurityGroups': _get_securitygroups_printable_value.__func__,
+        'CreatedTime': _get_createdtime_printable_value.__func__,
+        }
@@ -1,16 +1,166 @@
 """Classes that repressent groups of AWS instances.
 """
 
-from __future__ import print_function
 import abc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import hashlib
+import itertools
 import json
+import operator
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+
+from botocore import exceptions
+from botocore.config import Config
+from botocore.loaders import create_loader
+import botocore.session
+
+from .instances import Ec2Instance, ElbInstance
+
+# Upper bound on the number of (account, region) pairs queried at once
+MAX_WORKERS = 32
+
+# Used for every client. Each client only serves one account, region and
+# service and is only used by one thread at a time, so botocore's default
+# connection pool is plenty. TCP keep-alive stops firewalls and NAT gateways
+# silently dropping the cached clients' idle connections. Adaptive retries
+# back off when a region throttles the describe calls. The timeouts are well
+# below botocore's 60 second defaults so an unreachable endpoint fails fast
+# rather than holding a connection open.
+CLIENT_CONFIG = Config(tcp_keepalive=True,
+                       retries={'mode': 'adaptive', 'max_attempts': 5},
+                       connect_timeout=5,
+                       read_timeout=10)
+
+# Data loaders keyed by the data_path they search, shared by every session
+# configured with that path so each service model is only read and parsed
+# once, rather than once for every account and region. Only guarded by
+# _sessions_lock as loaders are only built along with a session.
+_data_loaders = {}
+
+# botocore sessions keyed by (account, region) and clients keyed by
+# (account, region, service), kept so repeated searches reuse them along with
+# their pooled connections. The locks make sure searches running at the same
+# time never build two of the same. Building a session only reads the AWS
+# config files so one lock covers them all. Building a client resolves its
+# credentials, which can mean running a credential_process or calling the
+# instance metadata service, so each client has its own lock in
+# _client_locks and different accounts never wait on each other.
+# _clients_lock only guards the two dicts.
+_sessions = {}
+_sessions_lock = threading.Lock()
+_clients = {}
+_client_locks = {}
+_clients_lock = threading.Lock()
+
+# Where the instances fetched for each account and region are cached between
+# runs
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'awssearch')
+
+# The key of the JSON object each datetime in a cached API response is stored
+# as, since JSON has no datetime type
+_CACHE_DATETIME_KEY = '__datetime__'
+
+# Largest page sizes the DescribeInstances and DescribeLoadBalancers APIs allow
+EC2_PAGE_SIZE = 1000
+ELB_PAGE_SIZE = 400
+
+# Encodes each instance in the JSON output. Built once rather than by a
+# json.dumps call for every instance.
+_JSON_ENCODER = json.JSONEncoder(indent=4)
+
+# A complete EC2 instance ID, which the API can look up directly. Older 8
+# character IDs aren't included as a search for one should still find the 17
+# character IDs that start with it.
+INSTANCE_ID_RE = re.compile(r'i-[0-9a-f]{17}')
+
+def close_clients():
+    """Close every cached client, releasing its pooled connections."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+def _encode_cache_value(obj):
+    """Return a JSON serializable copy of obj, a datetime from an API
+    response, for the instance cache."""
+    if isinstance(obj, datetime):
+        return {_CACHE_DATETIME_KEY: obj.isoformat()}
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+def _decode_cache_object(obj):
+    """Return the datetime a JSON object in the instance cache stands for,
+    or the object itself if it isn't one."""
+    if len(obj) == 1 and _CACHE_DATETIME_KEY in obj:
+        return datetime.fromisoformat(obj[_CACHE_DATETIME_KEY])
+    return obj
+
+def _lower_search_value(value):
+    """Return a lower-cased copy of a search value.
+
+    Lists of strings, such as the tags to match, are lower-cased item by item.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(item.lower() for item in value)
+    return value.lower()
+
+def _cell_lines(cell):
+    """Return the lines of text in a table cell.
 
-from terminaltables import AsciiTable
-import boto3
+    Like terminaltables, a trailing newline adds an empty last line.
+    """
+    if not hasattr(cell, 'splitlines'):
+        cell = str(cell)
+    lines = cell.splitlines() or ['']
+    if cell.endswith('\n'):
+        lines.append('')
+    return lines
 
-from instances import Ec2Instance, ElbInstance
+def _visible_width(text):
+    """Return the number of terminal columns text takes up.
 
-class SearchAWSResources(object):
+    East Asian wide and full-width characters take up two columns.
+    """
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(char) in ('F', 'W') else 1
+               for char in text)
+
+def _render_table_lines(table_data):
+    """Yield the lines of table_data drawn as an ASCII table with a border
+    around each row.
+
+    The output is the same as terminaltables' AsciiTable with
+    inner_row_border set, which is slow to build for large tables. The lines
+    are generated as they're written so the whole table is never held in
+    memory as one string.
+
+    Args:
+      - table_data: A list of rows, the first of which is the header. Cells
+        may contain several lines of text.
+    """
+    rows = [[_cell_lines(cell) for cell in row] for row in table_data]
+    widths = [max(_visible_width(line) for row in rows for line in row[column])
+              for column in range(len(rows[0]))]
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+    yield border
+    for row in rows:
+        for index in range(max(len(lines) for lines in row)):
+            line_cells = []
+            for lines, width in zip(row, widths):
+                line = lines[index] if index < len(lines) else ''
+                line_cells.append(line + ' ' * (width - _visible_width(line)))
+            yield '| ' + ' | '.join(line_cells) + ' |'
+        yield border
+
+class SearchAWSResources(abc.ABC):
     """Retrieve and operate on a set of AWS resources.
 
     methods:
@@ -18,34 +168,191 @@ class SearchAWSResources(object):
      - print_instances: Display the current set of AWS instances.
     """
 
-    def __init__(self, aws_accounts, aws_regions):
+    # Search fields in the order filter() matches them: the most selective
+    # and cheapest first, so a search that matches nothing stops as early as
+    # possible. Fields that aren't listed are matched last.
+    _match_order = ()
+
+    # The AWSInstance subclass each fetched instance is wrapped in
+    _instance_class = None
+
+    def __init__(self, aws_accounts, aws_regions, search_params=None,
+                 cache_ttl=0):
         """Contructor for Ec2Instances class.
 
         Args:
           - aws_accounts: A list of the AWS accounts to be queried. This name
           must match the name used in your local `~/.aws/confg`.
           - aws_regions: A list of AWS regions to search through.
+          - search_params: The search filter that will be applied. Any part
+          of it the AWS API can match on is sent with the request so fewer
+          instances are returned. (dict)
+          - cache_ttl: How many seconds the instances fetched from an account
+          and region are reused for by later searches. 0 disables the cache.
+          (int)
         """
         self.aws_regions = aws_regions
         self.aws_accounts = aws_accounts
+        self.cache_ttl = cache_ttl
+        # The (account, region) pairs that couldn't be searched
+        self.failed_locations = []
+        self.api_filters, self.api_search_params = \
+            self._get_api_filters(search_params or {})
         self.instances = self._get_all_instances()
 
     @staticmethod
     def _init_aws_session(account, region):
-        return boto3.Session(profile_name=account, region_name=region)
+        session = _sessions.get((account, region))
+        if session is None:
+            with _sessions_lock:
+                session = _sessions.get((account, region))
+                if session is None:
+                    # Clients are built straight from the botocore session.
+                    # A boto3 Session adds its resource models to the
+                    # session's loader, which would grow the shared loader's
+                    # search paths with every session built.
+                    session = botocore.session.Session(profile=account)
+                    data_path = session.get_config_variable('data_path')
+                    data_loader = _data_loaders.get(data_path)
+                    if data_loader is None:
+                        data_loader = create_loader(data_path)
+                        _data_loaders[data_path] = data_loader
+                    session.register_component('data_loader', data_loader)
+                    _sessions[(account, region)] = session
+        return session
+
+    @staticmethod
+    def _init_aws_client(account, region, service):
+        key = (account, region, service)
+        client = _clients.get(key)
+        if client is None:
+            with _clients_lock:
+                client_lock = _client_locks.setdefault(key, threading.Lock())
+            with client_lock:
+                client = _clients.get(key)
+                if client is None:
+                    session = SearchAWSResources._init_aws_session(account,
+                                                                   region)
+                    client = session.create_client(service, region_name=region,
+                                                   config=CLIENT_CONFIG)
+                    with _clients_lock:
+                        _clients[key] = client
+        return client
 
+    @staticmethod
     @abc.abstractmethod
-    def _get_instances(account, region):
-        """ Return instances of a given type in the given account and region"""
+    def _get_instances(account, region, api_filters):
+        """ Return the API's description of each instance of a given type in
+        the given account and region"""
         pass
 
+    @staticmethod
+    def _get_api_filters(search_params):
+        """Return the API filters equivalent to search_params.
+
+        Returns a tuple of the filters to send with the API request and the
+        subset of search_params they cover.
+        """
+        return [], {}
+
     def _get_all_instances(self):
         """ Return all instances of a given tyoe in a list of instance objects """
-        all_instances = [self._get_instances(account, region)
-                         for account in self.aws_accounts
-                         for region in self.aws_regions]
-        # all_instances is a list of lists so we need to break those out into one list
-        return [instance for inst_list in all_instances for instance in inst_list]
+        locations = [(account, region)
+                     for account in self.aws_accounts
+                     for region in self.aws_regions]
+        # The AWS API calls spend nearly all their time waiting on the network
+        # so query every account and region concurrently. Each account and
+        # region has its own session as sessions aren't thread safe.
+        workers = max(1, min(MAX_WORKERS, len(locations)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each result is a list of instances so chain them into one list
+            # as they arrive
+            return list(itertools.chain.from_iterable(executor.map(
+                lambda location: self._get_location_instances(*location),
+                locations)))
+
+    def _get_location_instances(self, account, region):
+        """Return the instances in an account and region.
+
+        The instances are read from the cache when it is fresh enough and
+        fetched from the API otherwise. If the API can't be reached or denies
+        the request, a warning is printed, the location is added to
+        failed_locations and no instances are returned.
+        """
+        raw_instances = self._read_cache(account, region)
+        if raw_instances is None:
+            try:
+                raw_instances = self._get_instances(account, region,
+                                                    self.api_filters)
+            except (exceptions.ClientError,
+                    exceptions.ConnectionError,
+                    exceptions.HTTPClientError) as error:
+                # Don't let one unreachable or denied region fail the whole
+                # search. Missing profiles and credentials still propagate as
+                # they affect every region.
+                print(f"Unable to search {account} in {region}: {error}",
+                      file=sys.stderr)
+                self.failed_locations.append((account, region))
+                return []
+            self._write_cache(account, region, raw_instances)
+        return [self._instance_class(instance, account)
+                for instance in raw_instances]
+
+    def _get_cache_path(self, account, region):
+        """Return the cache file for an account and region.
+
+        The API filters are part of the key as they change which instances
+        are returned.
+        """
+        cache_key = json.dumps([type(self).__name__, account, region,
+                                self.api_filters], sort_keys=True)
+        return os.path.join(
+            CACHE_DIR,
+            hashlib.sha1(cache_key.encode('utf-8')).hexdigest() + '.json')
+
+    def _read_cache(self, account, region):
+        """Return the cached instances for an account and region.
+
+        The cache is plain JSON, so a cache file written by anyone else can't
+        run code when it's read. Returns None if caching is disabled or there
+        is no fresh cache.
+        """
+        if not self.cache_ttl:
+            return None
+        cache_path = self._get_cache_path(account, region)
+        try:
+            if time.time() - os.stat(cache_path).st_mtime < self.cache_ttl:
+                with open(cache_path) as cache_fh:
+                    return json.load(cache_fh,
+                                     object_hook=_decode_cache_object)
+        except (IOError, OSError, ValueError):
+            pass
+        return None
+
+    def _write_cache(self, account, region, raw_instances):
+        """Cache the instances fetched for an account and region.
+
+        The cache is written to a temporary file first so a concurrent run
+        never reads a partially written file. Failures are ignored.
+        """
+        if not self.cache_ttl:
+            return
+        cache_path = self._get_cache_path(account, region)
+        try:
+            os.makedirs(CACHE_DIR, 0o700)
+        except OSError:
+            pass
+        try:
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR)
+            try:
+                with os.fdopen(tmp_fd, 'w') as cache_fh:
+                    json.dump(raw_instances, cache_fh,
+                              default=_encode_cache_value)
+                os.replace(tmp_path, cache_path)
+            except (IOError, OSError, TypeError, ValueError):
+                os.remove(tmp_path)
+        except (IOError, OSError):
+            pass
 
     def filter(self, search_params):
         """ Apply a filter to the AWS instances stored in instances.
@@ -58,25 +365,31 @@ class SearchAWSResources(object):
                "instance_tags": "env:prd",
               }
         """
+        # Parameters the API has already matched on don't need checking again
+        search_params = {field: value for field, value in search_params.items()
+                         if self.api_search_params.get(field) != value}
         if len(search_params) == 0:
             return
 
-        intermed_results = []
-        for field, value in search_params.items():
-            results = [inst for inst in self.instances if inst.match(field, value)]
-
-            # Since we're effectively ANDing each set of results with each
-            # iteration, any empty list forces the results to be empty
+        results = self.instances
+        for field, value in sorted(search_params.items(), key=self._get_match_rank):
+            # Lower-case once here; match() expects lower-cased values
+            value = _lower_search_value(value)
+            # We're effectively ANDing the fields, so each field only needs
+            # matching against the instances that matched every field before
+            # it, and an empty list forces the results to be empty
+            results = self._match_all(results, field, value)
             if len(results) == 0:
-                self.instances = []
+                break
 
-            if len(intermed_results) == 0:
-                intermed_results = results
-            else:
-                intermed_results = [inst for inst in results if inst in intermed_results]
-
-        self.instances = intermed_results
+        self.instances = results
 
+    def _get_match_rank(self, search_param):
+        """Return the position of a (field, value) pair in _match_order."""
+        try:
+            return self._match_order.index(search_param[0])
+        except ValueError:
+            return len(self._match_order)
 
     def _print_long_format(self, verbose):
         """Print instances in long format.
@@ -85,16 +398,45 @@ class SearchAWSResources(object):
         """
         raise NotImplementedError('This method has not been implemented.')
 
+    @staticmethod
     @abc.abstractmethod
-    def _get_printable_fields(verbose):
+    def _get_printable_attribute_names(verbose):
+        pass
+
+    @staticmethod
+    @abc.abstractmethod
+    def _match_all(instances, field, value):
         pass
 
+    @staticmethod
     @abc.abstractmethod
-    def _get_field_printable_value(instance, name, print_format):
+    def _get_field_formatters(verbose):
         pass
 
-    def _get_instance_data(self, instance, verbose, print_format):
-        return [self._get_field_printable_value(instance, attribute, print_format) for attribute in self._get_attributes(verbose)]
+    def _get_instances_data(self, verbose, print_format):
+        """Yield a list of the printable values of each instance's fields.
+
+        Args:
+          - verbose: Include all fields or not. (boolean)
+          - print_format: The format the values will be printed in.
+        """
+        formatters = self._get_field_formatters(verbose)
+        # Fetch all the fields of an instance in one call, then format only
+        # the columns that need it. itemgetter returns a bare value rather
+        # than a tuple when given a single name.
+        names = [name for name, _ in formatters]
+        if len(names) == 1:
+            get_fields = lambda instance: (instance[names[0]],)
+        else:
+            get_fields = operator.itemgetter(*names)
+        formatted_columns = [(column, format_function)
+                             for column, (_, format_function) in enumerate(formatters)
+                             if format_function is not None]
+        for instance in self.instances:
+            row = list(get_fields(instance))
+            for column, format_function in formatted_columns:
+                row[column] = format_function(row[column], print_format)
+            yield row
 
     def _print_json_format(self, verbose):
         """Print instanecs in json format.
@@ -103,11 +445,20 @@ class SearchAWSResources(object):
           - verbose: Print extra details or not. Boolean value.
         """
         attribute_names = list(self._get_printable_attribute_names(verbose))
-        output = []
-        for instance in self.instances:
-            output.append(dict(zip(attribute_names, self._get_instance_data(instance, verbose, print_format='json'))))
-        json_output = { 'instances': output }
-        print(json.dumps(json_output, indent=4))
+        # Each instance is encoded and written as soon as its row is built so
+        # the whole output is never held in memory. The result is the same as
+        # json.dumps({'instances': [...]}, indent=4).
+        encode = _JSON_ENCODER.encode
+        write = sys.stdout.write
+        write('{\n    "instances": [')
+        separator = '\n        '
+        for row in self._get_instances_data(verbose, print_format='json'):
+            instance_json = encode(dict(zip(attribute_names, row)))
+            write(separator + instance_json.replace('\n', '\n        '))
+            separator = ',\n        '
+        if separator != '\n        ':
+            write('\n    ')
+        write(']\n}\n')
 
 
 
@@ -122,10 +473,8 @@ class SearchAWSResources(object):
         # Add the headers to the table
         table_data = [list(self._get_printable_attribute_names(verbose))]
         # Gather the data for each instance
-        [table_data.append(self._get_instance_data(instance, verbose, print_format='table')) for instance in self.instances]
-        table = AsciiTable(table_data)
-        table.inner_row_border = True
-        print(table.table)
+        table_data.extend(self._get_instances_data(verbose, print_format='table'))
+        sys.stdout.writelines(line + '\n' for line in _render_table_lines(table_data))
 
     def print_instances(self, print_format='table', verbose=False):
         """Print instances in format specified by format
@@ -135,11 +484,13 @@ class SearchAWSResources(object):
         `json` format. Defaults to 'table'.
         - verbose: Print extra details or not. Defaults to 'False'.
         """
-        print_functions = {
-                'table': self._print_table_format, 
-                'json': self._print_json_format, 
-                }
-        print_functions[print_format](verbose)
+        getattr(self, self._print_functions[print_format])(verbose)
+
+    # The method that prints each print format
+    _print_functions = {
+            'table': '_print_table_format',
+            'json': '_print_json_format',
+            }
 
 
 class SearchEc2Instances(SearchAWSResources):
@@ -148,25 +499,71 @@ class SearchEc2Instances(SearchAWSResources):
     The public methods are available in the super class, SearchAWSResources.
     """
 
+    _match_order = (
+            'instance_id',
+            'instance_name',
+            'instance_ip',
+            'instance_state',
+            'instance_sg',
+            'instance_tags',
+            )
+
+    _instance_class = Ec2Instance
+
     @staticmethod
-    def _get_instances(account, region):
-         session = SearchAWSResources._init_aws_session(account, region)
-         client = session.client('ec2', region_name=region)
-         return  [Ec2Instance(instance, account)
-                  for reservations in client.describe_instances()['Reservations']
-                  for instance in reservations['Instances']]
+    def _get_instances(account, region, api_filters):
+        client = SearchAWSResources._init_aws_client(account, region, 'ec2')
+        pages = client.get_paginator('describe_instances').paginate(
+            Filters=api_filters,
+            PaginationConfig={'PageSize': EC2_PAGE_SIZE})
+        return [instance
+                for page in pages
+                for reservations in page['Reservations']
+                for instance in reservations['Instances']]
 
     @staticmethod
-    def _get_attributes(verbose):
-        return Ec2Instance.get_attributes(verbose)
+    def _get_api_filters(search_params):
+        """Return the DescribeInstances filters equivalent to search_params.
+
+        Only parameters the API matches the same way as Ec2Instance.match are
+        translated: the instance state and instance IDs. A complete 17
+        character ID is sent as an exact filter. Instance IDs are always
+        lower-case so any other ID, including an old 8 character one, is sent
+        as a wildcard filter, though it is still matched locally as well. The
+        API matches names, tags and security groups case-sensitively and can't
+        OR the private and public IP filters, so those are only filtered
+        locally.
+        """
+        api_filters = []
+        api_search_params = {}
+        instance_state = search_params.get('instance_state')
+        if instance_state:
+            api_filters.append({'Name': 'instance-state-name',
+                                'Values': [instance_state]})
+            api_search_params['instance_state'] = instance_state
+        instance_id = search_params.get('instance_id')
+        if instance_id:
+            instance_id_lower = instance_id.lower()
+            if INSTANCE_ID_RE.fullmatch(instance_id_lower):
+                api_filters.append({'Name': 'instance-id',
+                                    'Values': [instance_id_lower]})
+                api_search_params['instance_id'] = instance_id
+            elif '*' not in instance_id_lower and '?' not in instance_id_lower:
+                api_filters.append({'Name': 'instance-id',
+                                    'Values': [f'*{instance_id_lower}*']})
+        return api_filters, api_search_params
 
     @staticmethod
     def _get_printable_attribute_names(verbose):
         return Ec2Instance.get_printable_attribute_names(verbose)
 
     @staticmethod
-    def _get_field_printable_value(instance, name, print_format):
-        return Ec2Instance.get_field_printable_value(instance, name, print_format)
+    def _get_field_formatters(verbose):
+        return Ec2Instance.get_field_formatters(verbose)
+
+    @staticmethod
+    def _match_all(instances, field, value):
+        return Ec2Instance.match_all(instances, field, value)
 
 
 class SearchElbInstances(SearchAWSResources):
@@ -175,23 +572,32 @@ class SearchElbInstances(SearchAWSResources):
     The public methods are available in the super class, SearchAWSResources.
     """
 
-    @staticmethod
-    def _get_instances(account, region):
-         session = SearchAWSResources._init_aws_session(account, region)
-         client = session.client('elb', region_name=region)
-         return   [ElbInstance(instance, account)
-                   for instance in client.describe_load_balancers()['LoadBalancerDescriptions']]
+    _match_order = (
+            'instance_name',
+            'instance_dns_name',
+            )
+
+    _instance_class = ElbInstance
 
     @staticmethod
-    def _get_attributes(verbose):
-        return ElbInstance.get_attributes(verbose)
+    def _get_instances(account, region, api_filters):
+        client = SearchAWSResources._init_aws_client(account, region, 'elb')
+        pages = client.get_paginator('describe_load_balancers').paginate(
+            PaginationConfig={'PageSize': ELB_PAGE_SIZE})
+        return [instance
+                for page in pages
+                for instance in page['LoadBalancerDescriptions']]
 
     @staticmethod
     def _get_printable_attribute_names(verbose):
         return ElbInstance.get_printable_attribute_names(verbose)
 
     @staticmethod
-    def _get_field_printable_value(instance, name, print_format):
-        return ElbInstance.get_field_printable_value(instance, name, print_format)
+    def _get_field_formatters(verbose):
+        return ElbInstance.get_field_formatters(verbose)
+
+    @staticmethod
+    def _match_all(instances, field, value):
+        return ElbInstance.match_all(instances, field, value)
 
 
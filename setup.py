@@ -33,13 +33,18 @@ setup(
 
         'License :: OSI Approved :: MIT License',
 
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
     ],
 
     keywords='aws infrastructure',
 
-    install_requires=['terminaltables', 'boto3', 'pyyaml'],
+    python_requires='>=3.9',
+
+    install_requires=['botocore>=1.29.0', 'pyyaml'],
 
     entry_points={
         'console_scripts': [
@@ -0,0 +1,40 @@
+"""Tests for awssearch.instances.
+"""
+
+import unittest
+
+from awssearch.instances import Ec2Instance
+
+
+class MatchTagsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tagged = Ec2Instance(
+            {'InstanceId': 'i-1',
+             'Tags': [{'Key': 'Name', 'Value': 'web-01'},
+                      {'Key': 'env', 'Value': 'prd'}]},
+            'prod')
+        self.untagged = Ec2Instance({'InstanceId': 'i-2'}, 'prod')
+        self.instances = [self.tagged, self.untagged]
+
+    def match_all(self, value):
+        return Ec2Instance.match_all(self.instances, 'instance_tags', value)
+
+    def test_empty_term_is_skipped(self):
+        self.assertEqual(self.match_all(['']), self.instances)
+        self.assertEqual(self.match_all(['', 'env=prd']), [self.tagged])
+        self.assertEqual(self.match_all(['', 'env=dev']), [])
+
+    def test_match_agrees_with_match_all(self):
+        for value in ([''], ['', 'env=prd'], ['env=dev'], ['name=web']):
+            self.assertEqual(
+                [instance for instance in self.instances
+                 if instance.match('instance_tags', value)],
+                self.match_all(value))
+
+    def test_name_tag_is_not_a_search_tag(self):
+        self.assertEqual(self.match_all(['name=web']), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
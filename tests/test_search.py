@@ -0,0 +1,182 @@
+"""Tests for awssearch.search.
+"""
+
+import contextlib
+from datetime import datetime, timezone
+import io
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from awssearch import search
+from awssearch.instances import Ec2Instance
+from awssearch.search import SearchEc2Instances, _render_table_lines
+
+
+def _ec2_instance(instance_id, name):
+    return {
+        'InstanceId': instance_id,
+        'InstanceType': 't2.micro',
+        'State': {'Name': 'running'},
+        'Placement': {'AvailabilityZone': 'us-east-1a'},
+        'PrivateIpAddress': '10.0.0.1',
+        'Tags': [{'Key': 'Name', 'Value': name},
+                 {'Key': 'env', 'Value': 'prd'}],
+        'SecurityGroups': [{'GroupName': 'web', 'GroupId': 'sg-1'}],
+        'LaunchTime': datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        }
+
+
+def _search_without_fetching(instances=(), cache_ttl=0):
+    """Return a SearchEc2Instances holding instances without querying AWS."""
+    ec2_search = SearchEc2Instances.__new__(SearchEc2Instances)
+    ec2_search.aws_accounts = ['prod']
+    ec2_search.aws_regions = ['us-east-1']
+    ec2_search.cache_ttl = cache_ttl
+    ec2_search.failed_locations = []
+    ec2_search.api_filters, ec2_search.api_search_params = [], {}
+    ec2_search.instances = list(instances)
+    return ec2_search
+
+
+class RenderTableLinesTest(unittest.TestCase):
+    """The expected tables were captured from terminaltables 3.1.0's
+    AsciiTable with inner_row_border set, which the renderer replaces.
+    """
+
+    def assert_table(self, table_data, expected):
+        self.assertEqual('\n'.join(_render_table_lines(table_data)), expected)
+
+    def test_multiline_and_empty_cells(self):
+        self.assert_table(
+            [['Name', 'Tags'],
+             ['web-01', 'app=web\nenv=prd'],
+             ['db-01', '']],
+            '+--------+---------+\n'
+            '| Name   | Tags    |\n'
+            '+--------+---------+\n'
+            '| web-01 | app=web |\n'
+            '|        | env=prd |\n'
+            '+--------+---------+\n'
+            '| db-01  |         |\n'
+            '+--------+---------+')
+
+    def test_trailing_newline_adds_a_line(self):
+        self.assert_table(
+            [['Name', 'Tags'],
+             ['web-01', 'app=web\n'],
+             ['db-01', '\n']],
+            '+--------+---------+\n'
+            '| Name   | Tags    |\n'
+            '+--------+---------+\n'
+            '| web-01 | app=web |\n'
+            '|        |         |\n'
+            '+--------+---------+\n'
+            '| db-01  |         |\n'
+            '|        |         |\n'
+            '+--------+---------+')
+
+    def test_wide_characters_and_non_strings(self):
+        self.assert_table(
+            [['Name', 'Count'],
+             ['全角', 3],
+             ['web', None]],
+            '+------+-------+\n'
+            '| Name | Count |\n'
+            '+------+-------+\n'
+            '| 全角 | 3     |\n'
+            '+------+-------+\n'
+            '| web  | None  |\n'
+            '+------+-------+')
+
+
+class GetApiFiltersTest(unittest.TestCase):
+
+    def test_complete_id_is_an_exact_filter(self):
+        self.assertEqual(
+            SearchEc2Instances._get_api_filters(
+                {'instance_id': 'I-0123456789ABCDEF0'}),
+            ([{'Name': 'instance-id', 'Values': ['i-0123456789abcdef0']}],
+             {'instance_id': 'I-0123456789ABCDEF0'}))
+
+    def test_partial_id_is_a_wildcard_filter(self):
+        self.assertEqual(
+            SearchEc2Instances._get_api_filters({'instance_id': '0123'}),
+            ([{'Name': 'instance-id', 'Values': ['*0123*']}], {}))
+
+    def test_8_character_id_is_a_wildcard_filter(self):
+        self.assertEqual(
+            SearchEc2Instances._get_api_filters({'instance_id': 'i-1234abcd'}),
+            ([{'Name': 'instance-id', 'Values': ['*i-1234abcd*']}], {}))
+
+    def test_id_with_a_trailing_newline_is_not_exact(self):
+        api_filters, api_search_params = SearchEc2Instances._get_api_filters(
+            {'instance_id': 'i-0123456789abcdef0\n'})
+        self.assertEqual(api_filters[0]['Values'], ['*i-0123456789abcdef0\n*'])
+        self.assertEqual(api_search_params, {})
+
+    def test_id_with_wildcards_is_only_matched_locally(self):
+        self.assertEqual(
+            SearchEc2Instances._get_api_filters({'instance_id': 'i-12*'}),
+            ([], {}))
+
+    def test_state(self):
+        self.assertEqual(
+            SearchEc2Instances._get_api_filters({'instance_state': 'stopped'}),
+            ([{'Name': 'instance-state-name', 'Values': ['stopped']}],
+             {'instance_state': 'stopped'}))
+
+
+class InstanceCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.object(search, 'CACHE_DIR', cache_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_datetimes_round_trip(self):
+        ec2_search = _search_without_fetching(cache_ttl=60)
+        raw_instances = [_ec2_instance('i-0123456789abcdef0', 'web-01')]
+        ec2_search._write_cache('prod', 'us-east-1', raw_instances)
+        cached = ec2_search._read_cache('prod', 'us-east-1')
+        self.assertEqual(cached, raw_instances)
+        self.assertIsInstance(cached[0]['LaunchTime'], datetime)
+
+    def test_disabled_cache_is_not_read(self):
+        ec2_search = _search_without_fetching(cache_ttl=60)
+        ec2_search._write_cache('prod', 'us-east-1', [])
+        ec2_search.cache_ttl = 0
+        self.assertIsNone(ec2_search._read_cache('prod', 'us-east-1'))
+
+
+class PrintJsonFormatTest(unittest.TestCase):
+
+    def assert_matches_json_dumps(self, ec2_search, verbose):
+        names = ec2_search._get_printable_attribute_names(verbose)
+        expected = json.dumps(
+            {'instances': [dict(zip(names, row)) for row in
+                           ec2_search._get_instances_data(verbose, 'json')]},
+            indent=4) + '\n'
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            ec2_search.print_instances(print_format='json', verbose=verbose)
+        self.assertEqual(output.getvalue(), expected)
+
+    def test_matches_json_dumps(self):
+        ec2_search = _search_without_fetching([
+            Ec2Instance(_ec2_instance('i-0123456789abcdef0', 'web-01'), 'prod'),
+            Ec2Instance(_ec2_instance('i-0123456789abcdef1', 'w\u00e9b-02'),
+                        'prod'),
+            ])
+        for verbose in (False, True):
+            self.assert_matches_json_dumps(ec2_search, verbose)
+
+    def test_no_instances_matches_json_dumps(self):
+        self.assert_matches_json_dumps(_search_without_fetching(), False)
+
+
+if __name__ == '__main__':
+    unittest.main()